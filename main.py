@@ -36,9 +36,12 @@ if __name__ == "__main__":
         print("🔥 Project created by Siddhant Kochhar")
         print("📧 Contact: siddhant.kochhar1@gmail.com")
         
-        # Change to src directory and run with import string
-        os.chdir(src_path)
-        uvicorn.run("app:app", host="0.0.0.0", port=8000, reload=False)
+        # One worker by default: the report index, the response caches and the
+        # section cache are per-process state, so extra workers (WEB_CONCURRENCY)
+        # miss each other's updates. The import string is what uvicorn needs to
+        # start more than one; src is already on sys.path for the workers.
+        workers = int(os.getenv('WEB_CONCURRENCY', '1'))
+        uvicorn.run("app:app", host="0.0.0.0", port=8000, workers=workers)
         
     except ImportError as e:
         print(f"Error importing modules: {e}")
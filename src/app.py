@@ -5,94 +5,220 @@ A web interface to upload code and get empathetic feedback
 """
 
 from fastapi import FastAPI, Request, Form, File, UploadFile, HTTPException
-from fastapi.responses import HTMLResponse, FileResponse
+from fastapi.responses import HTMLResponse, FileResponse, StreamingResponse, Response
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 import os
-import json
-import tempfile
 import re
+import asyncio
+import threading
+import queue
+import logging
+import logging.handlers
+from contextlib import asynccontextmanager
+import orjson
+import cmarkgfm
+from cmarkgfm.cmark import Options
 from pathlib import Path
 from typing import List, Optional
 import uvicorn
 from dotenv import load_dotenv
 
+# Project directories, resolved from this file so the app works from any cwd
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+TEMPLATES_DIR = PROJECT_ROOT / "templates"
+STATIC_DIR = PROJECT_ROOT / "static"
+UPLOADS_DIR = PROJECT_ROOT / "uploads"
+REPORTS_DIR = PROJECT_ROOT / "reports"
+
 # Load environment variables from parent directory
-load_dotenv("../.env")
+load_dotenv(PROJECT_ROOT / ".env")
 
 # Import our existing functions
-from core.empathetic_code_reviewer import read_input_json, generate_ai_prompt, create_markdown_section
+from core.empathetic_code_reviewer import read_input_json, parse_review_bytes, parse_review_file, MMAP_THRESHOLD, generate_ai_prompt, create_markdown_section
 from core.save_markdown_report import save_markdown_report, generate_full_report
 
+logger = logging.getLogger(__name__)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Start this worker's log listener and report index, and flush logs on exit"""
+    setup_logging()
+    await asyncio.get_running_loop().run_in_executor(None, _get_report_index)
+    try:
+        yield
+    finally:
+        stop_logging()
+
 # Initialize FastAPI app
 app = FastAPI(
     title="Empathetic Code Reviewer",
     description="Generate empathetic and constructive code reviews using AI",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # Setup templates and static files
-templates = Jinja2Templates(directory="../templates")
+templates = Jinja2Templates(directory=str(TEMPLATES_DIR))
+
+# cmark-gfm renders fenced code as <pre lang="..."><code> and inline code as a
+# bare <code>; the templates style these through code-block / inline-code
+_CODE_TAG_RE = re.compile(r'<pre lang="([^"]*)"><code>|<pre><code>|<code>')
+
+def _add_code_classes(match):
+    """Map a cmark code tag onto the CSS classes the templates expect"""
+    tag = match.group(0)
+    if tag == '<code>':
+        return '<code class="inline-code">'
+    if match.group(1):
+        return f'<pre class="code-block"><code class="{match.group(1)}">'
+    return '<pre class="code-block"><code>'
+
+
+def _iter_markdown_html(text):
+    """
+    Render markdown to HTML with the libcmark-gfm C parser.
+    
+    Yields one HTML chunk per section (split at '---' rules) so callers can
+    stream the output. Raw HTML in the markdown is omitted by cmark.
+    """
+    html = cmarkgfm.github_flavored_markdown_to_html(text, options=Options.CMARK_OPT_HARDBREAKS)
+    html = _CODE_TAG_RE.sub(_add_code_classes, html)
+    
+    # Rules inside code blocks are escaped, so every literal <hr /> is a section break
+    sections = html.split('<hr />')
+    yield sections[0]
+    for section in sections[1:]:
+        yield '<hr />' + section
+
 
 def markdown_to_html(markdown_text):
     """Convert markdown text to HTML with proper formatting"""
     if not markdown_text:
         return ""
     
-    html = markdown_text
-    
-    # Convert headers
-    html = re.sub(r'^### (.*$)', r'<h3>\1</h3>', html, flags=re.MULTILINE)
-    html = re.sub(r'^## (.*$)', r'<h2>\1</h2>', html, flags=re.MULTILINE)
-    html = re.sub(r'^# (.*$)', r'<h1>\1</h1>', html, flags=re.MULTILINE)
+    return ''.join(_iter_markdown_html(markdown_text))
+
+def _stream_template(name, context):
+    """
+    Render a template as a streaming response.
     
-    # Convert bold text
-    html = re.sub(r'\*\*(.*?)\*\*', r'<strong>\1</strong>', html)
+    Starlette iterates the synchronous Jinja stream in its threadpool, so the
+    markdown conversion feeding the template also runs off the event loop and
+    the first bytes reach the browser before the whole page is rendered.
+    """
+    template = templates.get_template(name)
+    return StreamingResponse(template.stream(context), media_type="text/html")
+
+# Create directories if they don't exist
+TEMPLATES_DIR.mkdir(exist_ok=True)
+STATIC_DIR.mkdir(exist_ok=True)
+UPLOADS_DIR.mkdir(exist_ok=True)
+REPORTS_DIR.mkdir(exist_ok=True)
+
+# Mount static files
+app.mount("/static", StaticFiles(directory=str(STATIC_DIR)), name="static")
+
+# In-memory listing of saved reports (newest first) so /reports doesn't walk the
+# directory on every request. _report_index_mtime is the reports directory mtime
+# the index matches; a different value (e.g. another worker saved a report)
+# triggers a rescan. Updated from executor threads, hence the threading lock.
+_report_index = []
+_report_index_mtime = None
+_report_index_lock = threading.Lock()
+
+def _report_entry(report_file, stat):
+    """Build the listing entry for one report file"""
+    return {
+        "name": report_file.name,
+        "size": f"{stat.st_size / 1024:.1f} KB",
+        "created": stat.st_ctime
+    }
+
+def _scan_reports_dir():
+    """Collect name, size and creation time for every saved report"""
+    reports_dir = REPORTS_DIR
+    reports = []
     
-    # Convert code blocks
-    html = re.sub(r'```python\n(.*?)\n```', r'<pre class="code-block"><code class="python">\1</code></pre>', html, flags=re.DOTALL)
-    html = re.sub(r'```\n(.*?)\n```', r'<pre class="code-block"><code>\1</code></pre>', html, flags=re.DOTALL)
-    html = re.sub(r'```(.*?)```', r'<pre class="code-block"><code>\1</code></pre>', html, flags=re.DOTALL)
+    if reports_dir.exists():
+        for report_file in reports_dir.glob("*.md"):
+            reports.append(_report_entry(report_file, report_file.stat()))
     
-    # Convert inline code
-    html = re.sub(r'`(.*?)`', r'<code class="inline-code">\1</code>', html)
+    # Sort by creation time (newest first)
+    reports.sort(key=lambda x: x["created"], reverse=True)
     
-    # Convert bullet points
-    html = re.sub(r'^\* (.*$)', r'<li>\1</li>', html, flags=re.MULTILINE)
-    html = re.sub(r'^\- (.*$)', r'<li>\1</li>', html, flags=re.MULTILINE)
+    return reports
+
+def _get_report_index():
+    """Return a snapshot of the report index, rescanning only if the directory changed"""
+    global _report_index, _report_index_mtime
+    with _report_index_lock:
+        try:
+            mtime = REPORTS_DIR.stat().st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+        if mtime is None or mtime != _report_index_mtime:
+            _report_index = _scan_reports_dir()
+            _report_index_mtime = mtime
+        return list(_report_index)
+
+def _save_and_index_report(report, filename):
+    """Save a report and add it to the index without rescanning the directory"""
+    global _report_index, _report_index_mtime
+    with _report_index_lock:
+        try:
+            in_sync = _report_index_mtime is not None and REPORTS_DIR.stat().st_mtime_ns == _report_index_mtime
+        except FileNotFoundError:
+            in_sync = False
     
-    # Wrap consecutive list items in <ul>
-    html = re.sub(r'(<li>.*?</li>)', r'<ul>\1</ul>', html, flags=re.DOTALL)
-    html = re.sub(r'</ul>\s*<ul>', '', html)
+    # The write itself happens outside the lock so saves don't queue behind each other
+    success = save_markdown_report(report, filename)
     
-    # Convert line breaks
-    html = html.replace('\n\n', '</p><p>')
-    html = html.replace('\n', '<br>')
+    if success:
+        with _report_index_lock:
+            # _report_index_mtime is None if some save found the index stale; it
+            # must then be rebuilt rather than marked current again
+            if in_sync and _report_index_mtime is not None:
+                report_file = Path(filename)
+                # An overwritten report replaces its old entry
+                _report_index = [r for r in _report_index if r["name"] != report_file.name]
+                _report_index.insert(0, _report_entry(report_file, report_file.stat()))
+                _report_index_mtime = REPORTS_DIR.stat().st_mtime_ns
+            else:
+                _report_index_mtime = None
+    return success
+
+# Log records are handed to a queue and written by a listener thread, so a slow
+# terminal never blocks the event loop; DEBUG tracing is off unless LOG_LEVEL asks
+_log_listener = None
+
+def setup_logging():
+    """Route root logging through a QueueHandler drained by a background listener"""
+    global _log_listener
+    if _log_listener is not None:
+        return
     
-    # Wrap in paragraphs
-    html = f'<p>{html}</p>'
+    log_queue = queue.SimpleQueue()
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
     
-    # Clean up empty paragraphs
-    html = re.sub(r'<p>\s*</p>', '', html)
-    html = re.sub(r'<p>\s*(<h[1-6]>)', r'\1', html)
-    html = re.sub(r'(</h[1-6]>)\s*</p>', r'\1', html)
+    # QueueHandler.prepare() bakes its formatter's output into the record, so
+    # it only merges the message arguments; the listener adds time and level
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    queue_handler.setFormatter(logging.Formatter("%(message)s"))
     
-    # Handle horizontal rules
-    html = html.replace('---', '<hr>')
+    level = os.getenv('LOG_LEVEL', 'INFO').upper()
+    logging.basicConfig(level=getattr(logging, level, logging.INFO), handlers=[queue_handler])
     
-    return html
+    _log_listener = logging.handlers.QueueListener(log_queue, stream_handler)
+    _log_listener.start()
 
-# Add the function to Jinja2 templates
-templates.env.filters['markdown_to_html'] = markdown_to_html
-
-# Create directories if they don't exist (relative to project root)
-Path("../templates").mkdir(exist_ok=True)
-Path("../static").mkdir(exist_ok=True)
-Path("../uploads").mkdir(exist_ok=True)
-Path("../reports").mkdir(exist_ok=True)
-
-# Mount static files
-app.mount("/static", StaticFiles(directory="../static"), name="static")
+def stop_logging():
+    """Flush queued log records before the worker exits"""
+    global _log_listener
+    if _log_listener is not None:
+        _log_listener.stop()
+        _log_listener = None
 
 @app.get("/", response_class=HTMLResponse)
 async def home(request: Request):
@@ -108,7 +234,7 @@ async def create_review(
     """Process code review and return results"""
     try:
         # Parse comments (one per line)
-        comment_list = [comment.strip() for comment in comments.split('\n') if comment.strip()]
+        comment_list = list(filter(None, (comment.strip() for comment in comments.splitlines())))
         
         if not comment_list:
             raise HTTPException(status_code=400, detail="Please provide at least one review comment")
@@ -120,22 +246,25 @@ async def create_review(
         }
         
         # Generate the full report
-        markdown_report = generate_full_report(review_data)
+        markdown_report = await generate_full_report(review_data)
         
         # Save report to file
         import datetime
         timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-        report_filename = f"../reports/code_review_{timestamp}.md"
+        report_filename = (REPORTS_DIR / f"code_review_{timestamp}.md").as_posix()
         
-        success = save_markdown_report(markdown_report, report_filename)
+        # Write the report from a worker thread so the event loop stays free
+        success = await asyncio.get_running_loop().run_in_executor(None, _save_and_index_report, markdown_report, report_filename)
         
         if not success:
             raise HTTPException(status_code=500, detail="Failed to save report")
         
-        return templates.TemplateResponse("results_new.html", {
+        return _stream_template("results_new.html", {
             "request": request,
             "report": markdown_report,
-            "filename": report_filename,
+            "report_html_stream": _iter_markdown_html(markdown_report),
+            # Only the name: the full path would expose the server's directory layout
+            "filename": Path(report_filename).name,
             "success": True,
             "comment_count": len(comment_list)
         })
@@ -150,63 +279,54 @@ async def create_review(
 @app.post("/upload", response_class=HTMLResponse)
 async def upload_json(request: Request, file: UploadFile = File(...)):
     """Upload JSON file for code review"""
-    print(f"📤 Upload request received: {file.filename}")
+    logger.debug("📤 Upload request received: %s", file.filename)
     try:
         if not file.filename or not file.filename.endswith('.json'):
-            print(f"❌ Invalid file type: {file.filename}")
+            logger.debug("❌ Invalid file type: %s", file.filename)
             raise HTTPException(status_code=400, detail="Please upload a JSON file")
         
-        print(f"✅ Valid JSON file: {file.filename}")
+        logger.debug("✅ Valid JSON file: %s", file.filename)
         
-        # Save uploaded file temporarily
-        with tempfile.NamedTemporaryFile(mode='wb', delete=False, suffix='.json') as tmp_file:
-            content = await file.read()
-            tmp_file.write(content)
-            tmp_file_path = tmp_file.name
+        # Small uploads are parsed in memory; large ones are already spooled to
+        # disk by Starlette, so map that file instead of copying it into bytes
+        if file.size is not None and file.size >= MMAP_THRESHOLD:
+            review_data = await asyncio.get_running_loop().run_in_executor(None, parse_review_file, file.file)
+        else:
+            review_data = parse_review_bytes(await file.read())
+        logger.debug("📋 JSON data loaded successfully with %d comments", len(review_data['review_comments']))
         
-        print(f"📁 Temporary file saved: {tmp_file_path}")
+        # Generate the full report (optimized version)
+        logger.debug("🚀 Starting optimized report generation...")
+        markdown_report = await generate_full_report(review_data)
+        logger.debug("📝 Report generated successfully (%d characters)", len(markdown_report))
+        
+        # Save report to file
+        import datetime
+        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+        report_filename = (REPORTS_DIR / f"code_review_{timestamp}.md").as_posix()
+        
+        # Write the report from a worker thread so the event loop stays free
+        success = await asyncio.get_running_loop().run_in_executor(None, _save_and_index_report, markdown_report, report_filename)
+        
+        if not success:
+            raise HTTPException(status_code=500, detail="Failed to save report")
+        
+        logger.debug("✅ Upload processing completed successfully")
+        logger.debug("🎉 Report saved as: %s", report_filename)
+        
+        return _stream_template("results_new.html", {
+            "request": request,
+            "report": markdown_report,
+            "report_html_stream": _iter_markdown_html(markdown_report),
+            "filename": Path(report_filename).name,
+            "success": True,
+            "comment_count": len(review_data['review_comments']),
+            "uploaded_file": file.filename,
+            "generation_complete": True
+        })
         
-        try:
-            # Read the JSON file
-            review_data = read_input_json(tmp_file_path)
-            print(f"📋 JSON data loaded successfully with {len(review_data['review_comments'])} comments")
-            
-            # Generate the full report (optimized version)
-            print(f"🚀 Starting optimized report generation...")
-            markdown_report = generate_full_report(review_data)
-            print(f"📝 Report generated successfully ({len(markdown_report)} characters)")
-            
-            # Save report to file
-            import datetime
-            timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-            report_filename = f"../reports/code_review_{timestamp}.md"
-            
-            success = save_markdown_report(markdown_report, report_filename)
-            
-            if not success:
-                raise HTTPException(status_code=500, detail="Failed to save report")
-            
-            print(f"✅ Upload processing completed successfully")
-            print(f"🎉 Report saved as: {report_filename}")
-            
-            return templates.TemplateResponse("results_new.html", {
-                "request": request,
-                "report": markdown_report,
-                "filename": report_filename,
-                "success": True,
-                "comment_count": len(review_data['review_comments']),
-                "uploaded_file": file.filename,
-                "generation_complete": True
-            })
-            
-        finally:
-            # Clean up temporary file
-            if os.path.exists(tmp_file_path):
-                os.unlink(tmp_file_path)
-                print(f"🗑️ Temporary file cleaned up")
-            
     except Exception as e:
-        print(f"❌ Upload error: {str(e)}")
+        logger.warning("❌ Upload error: %s", e)
         return templates.TemplateResponse("results_new.html", {
             "request": request,
             "success": False,
@@ -216,8 +336,8 @@ async def upload_json(request: Request, file: UploadFile = File(...)):
 @app.get("/download/{filename}")
 async def download_report(filename: str):
     """Download generated report"""
-    file_path = f"../reports/{filename}"
-    if os.path.exists(file_path):
+    file_path = REPORTS_DIR / filename
+    if await asyncio.get_running_loop().run_in_executor(None, os.path.exists, file_path):
         return FileResponse(
             file_path, 
             media_type='text/markdown',
@@ -229,20 +349,8 @@ async def download_report(filename: str):
 @app.get("/reports")
 async def list_reports(request: Request):
     """List all generated reports"""
-    reports_dir = Path("../reports")
-    reports = []
-    
-    if reports_dir.exists():
-        for report_file in reports_dir.glob("*.md"):
-            stat = report_file.stat()
-            reports.append({
-                "name": report_file.name,
-                "size": f"{stat.st_size / 1024:.1f} KB",
-                "created": stat.st_ctime
-            })
-    
-    # Sort by creation time (newest first)
-    reports.sort(key=lambda x: x["created"], reverse=True)
+    # Served from the in-memory index; at most one stat() unless the directory changed
+    reports = await asyncio.get_running_loop().run_in_executor(None, _get_report_index)
     
     return templates.TemplateResponse("reports.html", {
         "request": request,
@@ -254,24 +362,27 @@ async def health_check():
     """Health check endpoint"""
     return {"status": "healthy", "message": "Empathetic Code Reviewer API is running"}
 
-@app.get("/api/sample")
-async def get_sample_data():
-    """Get sample data for testing"""
-    sample_data = {
-        "code_snippet": """def calculate_area(radius):
+# Sample review data, serialized once at import since it never changes
+_SAMPLE_DATA = {
+    "code_snippet": """def calculate_area(radius):
     return 3.14 * radius * radius
 
 def get_user_input():
     radius = input("Enter radius: ")
     return radius""",
-        "review_comments": [
-            "Consider using math.pi instead of hardcoded 3.14",
-            "The function get_user_input should validate input and convert to float",
-            "Add docstrings to explain what each function does",
-            "Consider error handling for invalid inputs"
-        ]
-    }
-    return sample_data
+    "review_comments": [
+        "Consider using math.pi instead of hardcoded 3.14",
+        "The function get_user_input should validate input and convert to float",
+        "Add docstrings to explain what each function does",
+        "Consider error handling for invalid inputs"
+    ]
+}
+_SAMPLE_BYTES = orjson.dumps(_SAMPLE_DATA)
+
+@app.get("/api/sample")
+async def get_sample_data():
+    """Get sample data for testing"""
+    return Response(content=_SAMPLE_BYTES, media_type="application/json")
 
 if __name__ == "__main__":
     # Check if GEMINI_API_KEY is set
@@ -283,4 +394,7 @@ if __name__ == "__main__":
     print("🚀 Starting Empathetic Code Reviewer Web App...")
     print("📱 Open your browser to: http://localhost:8000")
     
-    uvicorn.run(app, host="0.0.0.0", port=8000, reload=True)
+    # One worker by default: the report index and caches are per-process state
+    # (see WEB_CONCURRENCY in the README). More workers need the import string.
+    workers = int(os.getenv('WEB_CONCURRENCY', '1'))
+    uvicorn.run("app:app", host="0.0.0.0", port=8000, workers=workers)
@@ -8,105 +8,178 @@ to generate empathetic feedback for code reviews.
 
 import json
 import os
-from typing import Dict, List, Any, Optional
-import google.generativeai as genai
+import re
+import mmap
+import asyncio
+from functools import lru_cache
+import orjson
+from typing import Dict, List, Any, Optional, BinaryIO, IO, Union
 from pathlib import Path
 
 
-def read_input_json(file_path: str) -> Dict[str, Any]:
+def validate_review_data(data: Any, validate: bool = True) -> Dict[str, Any]:
     """
-    Read and parse a JSON file containing code review data.
+    Validate parsed review data and return only the expected fields.
     
     Args:
-        file_path: Path to the JSON file to read.
+        data: The decoded JSON value to validate.
+        validate: Whether to check that every review comment is a string.
+            Callers whose data was already validated upstream can skip it.
         
     Returns:
         Dictionary with keys 'code_snippet' and 'review_comments'.
         
     Raises:
-        FileNotFoundError: If the file doesn't exist.
-        json.JSONDecodeError: If the file contains invalid JSON.
         KeyError: If required keys 'code_snippet' or 'review_comments' are missing.
         ValueError: If the data structure is invalid.
     """
-    try:
-        # Check if file exists
-        if not os.path.exists(file_path):
-            raise FileNotFoundError(f"File not found: {file_path}")
-        
-        # Read and parse JSON file
-        with open(file_path, 'r', encoding='utf-8') as file:
-            data = json.load(file)
+    # Validate that data is a dictionary
+    if not isinstance(data, dict):
+        raise ValueError("JSON file must contain a dictionary object")
+    
+    # Check for required keys
+    if 'code_snippet' not in data:
+        raise KeyError("Missing required key 'code_snippet' in JSON data")
+    
+    if 'review_comments' not in data:
+        raise KeyError("Missing required key 'review_comments' in JSON data")
+    
+    # Validate data types
+    if not isinstance(data['code_snippet'], str):
+        raise ValueError("'code_snippet' must be a string")
+    
+    if not isinstance(data['review_comments'], list):
+        raise ValueError("'review_comments' must be a list")
+    
+    # Validate that review_comments contains strings
+    if validate and not all(isinstance(comment, str) for comment in data['review_comments']):
+        raise ValueError("review_comments must contain only strings")
+    
+    return {
+        'code_snippet': data['code_snippet'],
+        'review_comments': data['review_comments']
+    }
+
+
+# Review files at least this large are parsed through mmap instead of read()
+MMAP_THRESHOLD = 1 << 20
+
+
+def parse_review_bytes(content: bytes, validate: bool = True) -> Dict[str, Any]:
+    """
+    Decode review JSON from raw bytes and validate its structure.
+    
+    Args:
+        content: The JSON document as bytes, str or a buffer such as a memoryview.
+        validate: Whether to type-check every review comment.
         
-        # Validate that data is a dictionary
-        if not isinstance(data, dict):
-            raise ValueError("JSON file must contain a dictionary object")
+    Returns:
+        Dictionary with keys 'code_snippet' and 'review_comments'.
         
-        # Check for required keys
-        if 'code_snippet' not in data:
-            raise KeyError("Missing required key 'code_snippet' in JSON data")
+    Raises:
+        json.JSONDecodeError: If the content is not valid JSON.
+        KeyError: If required keys 'code_snippet' or 'review_comments' are missing.
+        ValueError: If the data structure is invalid.
+    """
+    return validate_review_data(orjson.loads(content), validate=validate)
+
+
+def parse_review_file(file: BinaryIO, validate: bool = True) -> Dict[str, Any]:
+    """
+    Decode review JSON from an open binary file and validate its structure.
+    
+    Files of MMAP_THRESHOLD bytes or more are memory-mapped and parsed in place
+    rather than copied into a bytes object first.
+    
+    Args:
+        file: A binary file object backed by a real file descriptor.
+        validate: Whether to type-check every review comment.
         
-        if 'review_comments' not in data:
-            raise KeyError("Missing required key 'review_comments' in JSON data")
+    Returns:
+        Dictionary with keys 'code_snippet' and 'review_comments'.
+    """
+    if os.fstat(file.fileno()).st_size < MMAP_THRESHOLD:
+        file.seek(0)
+        return parse_review_bytes(file.read(), validate=validate)
+    
+    with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped, memoryview(mapped) as view:
+        return parse_review_bytes(view, validate=validate)
+
+
+@lru_cache(maxsize=8)
+def _read_cached(file_path: str, mtime_ns: int, size: int, validate: bool) -> Dict[str, Any]:
+    """
+    Parse a review file, memoized on its path, modification time and size.
+    
+    A changed file gets a new key and is parsed again. Failures raise and are
+    therefore never cached.
+    """
+    with open(file_path, 'rb') as file:
+        return parse_review_file(file, validate=validate)
+
+
+def read_input_json(file_path: Union[str, IO], validate: bool = True) -> Dict[str, Any]:
+    """
+    Read and parse a JSON file containing code review data.
+    
+    Args:
+        file_path: Path to the JSON file to read, or an open text or binary
+            file-like object (e.g. io.StringIO) whose contents are parsed directly.
+        validate: Whether to type-check every review comment.
         
-        # Validate data types
-        if not isinstance(data['code_snippet'], str):
-            raise ValueError("'code_snippet' must be a string")
+    Returns:
+        Dictionary with keys 'code_snippet' and 'review_comments'.
         
-        if not isinstance(data['review_comments'], list):
-            raise ValueError("'review_comments' must be a list")
+    Raises:
+        FileNotFoundError: If the file doesn't exist.
+        json.JSONDecodeError: If the file contains invalid JSON.
+        KeyError: If required keys 'code_snippet' or 'review_comments' are missing.
+        ValueError: If the data structure is invalid.
+    """
+    is_file_like = hasattr(file_path, 'read')
+    source = getattr(file_path, 'name', '<stream>') if is_file_like else file_path
+    
+    try:
+        # File-like objects are read as-is; they have no mtime to cache on
+        if is_file_like:
+            return parse_review_bytes(file_path.read(), validate=validate)
         
-        # Validate that review_comments contains strings
-        for i, comment in enumerate(data['review_comments']):
-            if not isinstance(comment, str):
-                raise ValueError(f"review_comments[{i}] must be a string, got {type(comment).__name__}")
+        # Repeated reads of an unchanged file are served from the parse cache;
+        # os.stat() raises FileNotFoundError itself
+        stat = os.stat(file_path)
+        data = _read_cached(file_path, stat.st_mtime_ns, stat.st_size, validate)
         
+        # Hand out a copy so callers can't modify the cached entry
         return {
             'code_snippet': data['code_snippet'],
-            'review_comments': data['review_comments']
+            'review_comments': list(data['review_comments'])
         }
         
     except FileNotFoundError as e:
         print(f"Error: {e}")
         raise
     except json.JSONDecodeError as e:
-        print(f"Error: Invalid JSON in file '{file_path}': {e}")
+        print(f"Error: Invalid JSON in file '{source}': {e}")
         raise
     except (KeyError, ValueError) as e:
         print(f"Error: {e}")
         raise
     except Exception as e:
-        print(f"Unexpected error reading file '{file_path}': {e}")
+        print(f"Unexpected error reading file '{source}': {e}")
         raise
 
 
-def generate_ai_prompt(code_snippet: str, comment: str) -> str:
-    """
-    Generate an AI prompt for empathetic code review based on a single code snippet and comment.
-    Follows hackathon specifications for transforming critical feedback into constructive growth.
-    
-    Args:
-        code_snippet: The code to be reviewed.
-        comment: A single review comment or suggestion.
-        
-    Returns:
-        A formatted string prompt ready to send to an LLM like Google Gemini.
-        
-    The prompt instructs the AI to:
-    1. Rephrase the comment positively and encouragingly
-    2. Explain why the suggestion matters (performance, readability, Python conventions)
-    3. Provide a concrete improved code example with explanation
-    """
-    prompt = f"""You are an empathetic senior developer and mentor participating in "The Empathetic Code Reviewer" mission. Your goal is to transform critical feedback into constructive growth opportunities.
+# Prompt scaffold for generate_ai_prompt, filled in with str.format_map
+_PROMPT_TEMPLATE = """You are an empathetic senior developer and mentor participating in "The Empathetic Code Reviewer" mission. Your goal is to transform critical feedback into constructive growth opportunities.
 
 **Mission:** Transform critical code review feedback into empathetic, educational guidance that helps developers learn while building their confidence.
 
 **Code being reviewed:**
 ```python
-{code_snippet.strip()}
+{code}
 ```
 
-**Original critical comment:** "{comment.strip()}"
+**Original critical comment:** "{comment}"
 
 **Your task:** Rewrite this feedback following these requirements:
 
@@ -138,7 +211,40 @@ Here's how you can enhance this:
 
 Please generate your empathetic, educational response that transforms the critical feedback into constructive guidance:"""
 
-    return prompt
+
+@lru_cache(maxsize=256)
+def generate_ai_prompt(code_snippet: str, comment: str) -> str:
+    """
+    Generate an AI prompt for empathetic code review based on a single code snippet and comment.
+    Follows hackathon specifications for transforming critical feedback into constructive growth.
+    
+    Args:
+        code_snippet: The code to be reviewed.
+        comment: A single review comment or suggestion.
+        
+    Returns:
+        A formatted string prompt ready to send to an LLM like Google Gemini.
+        
+    The prompt instructs the AI to:
+    1. Rephrase the comment positively and encouragingly
+    2. Explain why the suggestion matters (performance, readability, Python conventions)
+    3. Provide a concrete improved code example with explanation
+    
+    Results are memoized, so repeated (code_snippet, comment) pairs such as
+    retries reuse the prompt built the first time.
+    """
+    return _PROMPT_TEMPLATE.format_map({'code': code_snippet.strip(), 'comment': comment.strip()})
+
+
+# Patterns used by create_markdown_section to pull parts out of an AI response
+# Fenced code, tagged python/py or untagged
+_CODE_BLOCK_RE = re.compile(r'```(?:python|py)?[ \t]*\n(.*?)\n?```', re.DOTALL)
+# A sentence: anything up to end-of-sentence punctuation or a newline (so "math.pi" stays intact)
+_SENTENCE_RE = re.compile(r'(?:[^.!?\n]|[.!?](?=\S))+[.!?]?')
+_REPHRASE_RE = re.compile(r'\b(?:opportunity|enhance|improve|better way|consider|suggestion)', re.IGNORECASE)
+_WHY_RE = re.compile(r'\b(?:because|this helps|this improves|performance|readability|maintainability|convention)', re.IGNORECASE)
+# Sentences opening like this explain a change, so they are never taken as the rephrasing
+_WHY_LEAD_RE = re.compile(r'this (?:helps|improves)\b', re.IGNORECASE)
 
 
 def create_markdown_section(original_comment: str, ai_response: str) -> str:
@@ -161,63 +267,36 @@ def create_markdown_section(original_comment: str, ai_response: str) -> str:
     original_comment = original_comment.strip()
     ai_response = ai_response.strip()
     
-    # Initialize extracted sections
-    positive_rephrasing = ""
-    why_explanation = ""
-    improved_code = ""
-    
-    # Try to extract sections from AI response
-    # This is a simple parsing approach - could be enhanced based on AI response patterns
-    lines = ai_response.split('\n')
-    
-    # Look for common patterns in AI responses
-    current_section = None
-    code_block_started = False
-    code_lines = []
+    # Split the response into sentences once, then look for each part's keywords
+    code_match = _CODE_BLOCK_RE.search(ai_response)
+    response_sentences = [match.group().strip() for match in _SENTENCE_RE.finditer(ai_response)]
+    rephrase_index = next(
+        (index for index, sentence in enumerate(response_sentences)
+         if _REPHRASE_RE.search(sentence) and not _WHY_LEAD_RE.match(sentence)),
+        None
+    )
+    # Look for the explanation after the rephrasing so one sentence isn't used twice
+    why_start = 0 if rephrase_index is None else rephrase_index + 1
+    why_sentence = next((sentence for sentence in response_sentences[why_start:] if _WHY_RE.search(sentence)), None)
     
-    for line in lines:
-        line_lower = line.lower().strip()
-        
-        # Detect positive rephrasing section
-        if any(keyword in line_lower for keyword in ['opportunity', 'enhance', 'improve', 'better way', 'consider', 'suggestion']):
-            if not positive_rephrasing and len(line.strip()) > 20:  # Avoid short lines
-                positive_rephrasing = line.strip()
-        
-        # Detect explanation section
-        elif any(keyword in line_lower for keyword in ['because', 'this helps', 'this improves', 'performance', 'readability', 'maintainability', 'convention']):
-            if not why_explanation and len(line.strip()) > 20:
-                why_explanation = line.strip()
-        
-        # Detect code blocks
-        elif '```python' in line_lower:
-            code_block_started = True
-            continue
-        elif '```' in line and code_block_started:
-            code_block_started = False
-            if code_lines:
-                improved_code = '\n'.join(code_lines)
-            continue
-        elif code_block_started:
-            code_lines.append(line)
-    
-    # Fallback: if we couldn't extract specific sections, use the full response intelligently
-    if not positive_rephrasing:
+    if rephrase_index is not None:
+        positive_rephrasing = response_sentences[rephrase_index]
+    else:
         # Take the first substantial sentence as positive rephrasing
-        sentences = [s.strip() for s in ai_response.split('.') if len(s.strip()) > 20]
+        sentences = [sentence.strip() for sentence in ai_response.split('.') if len(sentence.strip()) > 20]
         if sentences:
             positive_rephrasing = sentences[0] + '.'
         else:
             positive_rephrasing = "Here's an opportunity to enhance your code"
     
-    if not why_explanation:
-        # Look for explanatory content
-        sentences = [s.strip() for s in ai_response.split('.') if any(word in s.lower() for word in ['performance', 'readability', 'maintainability', 'best practice', 'convention'])]
-        if sentences:
-            why_explanation = sentences[0] + '.'
-        else:
-            why_explanation = "This improvement enhances code quality and follows Python best practices"
+    if why_sentence:
+        why_explanation = why_sentence
+    else:
+        why_explanation = "This improvement enhances code quality and follows Python best practices"
     
-    if not improved_code:
+    if code_match:
+        improved_code = code_match.group(1)
+    else:
         # If no code block found, indicate that code example should be provided
         improved_code = "# Improved code example would be provided by the AI response"
     
@@ -239,6 +318,47 @@ def create_markdown_section(original_comment: str, ai_response: str) -> str:
     return markdown_section
 
 
+# google.generativeai pulls in grpc and protobuf, so it is only imported once a
+# real model is needed; simulated runs never pay for it
+_genai = None
+
+# Process-wide Gemini model, created on first use by get_model()
+_MODEL = None
+_MODEL_API_KEY = None
+
+
+def load_genai():
+    """Import google.generativeai on first use and return the cached module."""
+    global _genai
+    if _genai is None:
+        import google.generativeai as genai
+        _genai = genai
+    return _genai
+
+
+def get_model(api_key: Optional[str] = None):
+    """
+    Return the shared Gemini model, configuring the client on first use.
+    
+    Reusing one model keeps the underlying client and its open connection
+    alive across reviewers and requests instead of reconnecting each time.
+    
+    Args:
+        api_key: Gemini API key. If None, will try to get from environment variable.
+        
+    Returns:
+        The shared genai.GenerativeModel instance.
+    """
+    global _MODEL, _MODEL_API_KEY
+    api_key = api_key or os.getenv('GEMINI_API_KEY')
+    if _MODEL is None or api_key != _MODEL_API_KEY:
+        genai = load_genai()
+        genai.configure(api_key=api_key)
+        _MODEL = genai.GenerativeModel('gemini-1.5-flash')
+        _MODEL_API_KEY = api_key
+    return _MODEL
+
+
 class EmpathethicCodeReviewer:
     """
     A class to handle empathetic code review generation using AI models.
@@ -255,9 +375,8 @@ class EmpathethicCodeReviewer:
         if not self.api_key:
             raise ValueError("Gemini API key not provided. Set GEMINI_API_KEY environment variable or pass api_key parameter.")
         
-        # Configure Gemini
-        genai.configure(api_key=self.api_key)
-        self.model = genai.GenerativeModel('gemini-1.5-flash')
+        # Reuse the shared Gemini model and its connection
+        self.model = get_model(self.api_key)
     
     def load_review_data(self, file_path: str) -> Dict[str, Any]:
         """
@@ -275,8 +394,7 @@ class EmpathethicCodeReviewer:
             KeyError: If required keys are missing from the JSON.
         """
         try:
-            with open(file_path, 'r', encoding='utf-8') as file:
-                data = json.load(file)
+            data = orjson.loads(Path(file_path).read_bytes())
             
             # Validate required fields
             if 'code_snippet' not in data:
@@ -289,7 +407,7 @@ class EmpathethicCodeReviewer:
         except FileNotFoundError:
             raise FileNotFoundError(f"Review data file not found: {file_path}")
         except json.JSONDecodeError as e:
-            raise json.JSONDecodeError(f"Invalid JSON in file {file_path}: {e}")
+            raise json.JSONDecodeError(f"Invalid JSON in file {file_path}: {e.msg}", e.doc, e.pos)
     
     def create_review_data(self, code_snippet: str, review_comments: List[str]) -> Dict[str, Any]:
         """
@@ -307,7 +425,7 @@ class EmpathethicCodeReviewer:
             "review_comments": review_comments
         }
     
-    def generate_empathetic_feedback(self, review_data: Dict[str, Any]) -> str:
+    async def generate_empathetic_feedback(self, review_data: Dict[str, Any]) -> str:
         """
         Generate empathetic feedback for code review using AI.
         
@@ -324,7 +442,7 @@ class EmpathethicCodeReviewer:
         prompt = self._create_empathetic_prompt(code_snippet, review_comments)
         
         try:
-            response = self.model.generate_content(prompt)
+            response = await self.model.generate_content_async(prompt)
             return response.text
         except Exception as e:
             return f"Error generating feedback: {str(e)}"
@@ -422,8 +540,8 @@ def get_user_input():
             review_data = reviewer.create_review_data(sample_code, sample_comments)
             
             # Save sample data for future use
-            with open(json_file_path, 'w', encoding='utf-8') as f:
-                json.dump(review_data, f, indent=2)
+            with open(json_file_path, 'wb') as f:
+                f.write(orjson.dumps(review_data, option=orjson.OPT_INDENT_2))
             print(f"Sample review data created and saved to {json_file_path}")
             
             # Demonstrate reading the file we just created
@@ -450,7 +568,7 @@ def get_user_input():
         
         # Generate empathetic feedback using the class method
         print("\nGenerating empathetic feedback using class method...")
-        feedback = reviewer.generate_empathetic_feedback(review_data)
+        feedback = asyncio.run(reviewer.generate_empathetic_feedback(review_data))
         
         # Display the feedback
         print("\n" + "="*60)
@@ -1,9 +1,97 @@
 import os
+import re
 from pathlib import Path
 import time
+import contextlib
 import asyncio
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import hashlib
+import logging
+import tempfile
 import threading
+from datetime import datetime
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, List, Optional, TextIO
+import orjson
+from .empathetic_code_reviewer import read_input_json, generate_ai_prompt, create_markdown_section, get_model
+
+log = logging.getLogger("reviewer")
+
+# Upper bound on Gemini requests in flight for a single report
+MAX_CONCURRENT_AI_CALLS = 8
+
+# Output budget and timeout for the single batched request covering all comments
+BATCH_TOKENS_PER_COMMENT = 800
+MAX_BATCH_OUTPUT_TOKENS = 8192
+BATCH_TIMEOUT_SECONDS = 60
+
+# Time allowed for one per-comment request, counted from when it was submitted
+# (so time spent waiting for a semaphore slot is included)
+AI_CALL_TIMEOUT_SECONDS = 30
+
+# Fixed closing parts of every report
+HOLISTIC_SUMMARY = (
+    "\n## 🎉 Holistic Summary\n\n"
+    "**Excellent work on your code!** The suggestions above represent opportunities to elevate your already solid foundation. "
+    "Each recommendation focuses on fundamental software development principles like performance optimization, code readability, "
+    "and maintainability. Remember, even experienced developers constantly refine their code - it's a sign of growth, not weakness. "
+    "These improvements will make your code more professional, efficient, and easier for your future self and teammates to understand. "
+    "Keep up the fantastic work and continue embracing the learning journey! 🚀\n\n"
+)
+REPORT_FOOTER = (
+    "---\n"
+    "*Report generated by Empathetic Code Reviewer | Transforming Critical Feedback into Constructive Growth*\n"
+)
+
+# Keywords used to pick a canned response for a comment, matched as substrings
+# of the lowercased comment ("inefficiently" counts as "inefficient"). Each
+# alternation checks a whole keyword list in one precompiled scan. The simulated
+# and fallback responses keep their own lists.
+_SIMULATED_PERF_RE = re.compile(r"inefficient|performance")
+_SIMULATED_NAMING_RE = re.compile(r"name|bad")  # only together with "variable"
+_SIMULATED_DOC_RE = re.compile(r"docstring|documentation")
+_FALLBACK_PERF_RE = re.compile(r"inefficient|performance|slow|loop|optimize")
+_FALLBACK_NAMING_RE = re.compile(r"variable|name|naming|'u'")
+_FALLBACK_BOOL_RE = re.compile(r"boolean|true|false|redundant|== true")
+_FALLBACK_DOC_RE = re.compile(r"docstring|documentation|comment|document")
+
+# Grammar of a per-comment AI response: the three labelled parts in order,
+# optionally bulleted or bolded, with the 'Why' and improvement parts optional
+_SECTION_RE = re.compile(
+    r"Positive Rephrasing:\**\s*(?P<pos>.*?)\s*"
+    r"(?:[-*\s]*The '?Why'?:\**\s*(?P<why>.*?)\s*)?"
+    r"(?:[-*\s]*Suggested Improvement:\**\s*(?P<imp>.*?))?\s*$",
+    re.DOTALL
+)
+# Fenced code blocks inside the improvement part; split() yields text/code alternately
+_FENCE_RE = re.compile(r"```[^\n]*\n(.*?)```", re.DOTALL)
+
+# Number of AI responses kept in the in-process LRU cache
+AI_RESPONSE_CACHE_SIZE = 2048
+
+_ai_response_cache = OrderedDict()
+_ai_inflight = {}
+
+# Settings sent with every request to the shared model, tuned for faster generation
+_GEN_CONFIG = {
+    "temperature": 0.7,
+    "top_p": 0.8,
+    "top_k": 40,
+    "max_output_tokens": 400,  # A full rephrasing/why/code answer fits in ~250 tokens
+    "response_mime_type": "text/plain",
+}
+
+# Rendered sections are also persisted across runs. Bump PROMPT_VERSION whenever
+# the prompts or section layout change so stale sections are not reused.
+PROMPT_VERSION = "1"
+SECTION_CACHE_PATH = Path(os.getenv(
+    'EMPATHETIC_REVIEWER_CACHE',
+    Path.home() / ".cache" / "empathetic_reviewer" / "sections.json"
+))
+SECTION_CACHE_SIZE = 1024
+
+_section_cache = None
+_section_cache_lock = threading.Lock()
 
 
 def save_markdown_report(report, filename):
@@ -35,9 +123,31 @@ def save_markdown_report(report, filename):
         # Create parent directories if they don't exist
         file_path.parent.mkdir(parents=True, exist_ok=True)
         
-        # Write the markdown content to file
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(report)
+        # Encode once and hand the bytes to the kernel directly; os.write may
+        # write less than asked, so loop until everything is out
+        data = memoryview(report.encode('utf-8'))
+        # A unique temp file per save, so concurrent saves of one name never
+        # write into each other's temp file
+        fd, tmp_path = tempfile.mkstemp(dir=file_path.parent, suffix=".tmp")
+        try:
+            try:
+                # mkstemp creates the file owner-only; reports stay world-readable
+                os.chmod(tmp_path, 0o644)
+                written = 0
+                while written < len(data):
+                    written += os.write(fd, data[written:])
+            finally:
+                os.close(fd)
+            
+            # No fsync: reports can be regenerated, so paying for durability here
+            # would only slow down every save. os.replace still guarantees readers
+            # see either the old file or the complete new one.
+            os.replace(tmp_path, file_path)
+        except BaseException:
+            # A failed cleanup must not hide the error that got us here
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(tmp_path)
+            raise
         
         print(f"Markdown report successfully saved to: {file_path.absolute()}")
         return True
@@ -63,76 +173,144 @@ def save_markdown_report(report, filename):
         return False
 
 
-import google.generativeai as genai
-from .empathetic_code_reviewer import read_input_json, generate_ai_prompt, create_markdown_section
+def _response_cache_key(code_snippet, comment):
+    """Hash a (code_snippet, comment) pair into an AI response cache key."""
+    return hashlib.sha256(f"{code_snippet}||{comment}".encode('utf-8')).hexdigest()
 
 
-def save_markdown_report(report, filename):
+def _section_cache_key(code_snippet, comment):
+    """Hash a (code_snippet, comment) pair into an on-disk section cache key."""
+    return hashlib.sha256(f"{PROMPT_VERSION}|{code_snippet}|{comment}".encode('utf-8')).hexdigest()
+
+
+def _load_section_cache():
+    """Load the on-disk section cache once; a missing or corrupt file starts empty."""
+    global _section_cache
+    if _section_cache is None:
+        try:
+            _section_cache = OrderedDict(orjson.loads(SECTION_CACHE_PATH.read_bytes()))
+        except (OSError, ValueError, TypeError):
+            _section_cache = OrderedDict()
+    return _section_cache
+
+
+def lookup_cached_sections(keys):
     """
-    Saves a Markdown report to a specified file.
+    Look up previously generated markdown sections.
     
     Args:
-        report (str): The Markdown content to save
-        filename (str): The path/filename where the report should be saved
+        keys (list): Keys from _section_cache_key
     
     Returns:
-        bool: True if successful, False otherwise
+        list: The cached section for each key, or None where there is none
+    """
+    with _section_cache_lock:
+        cache = _load_section_cache()
+        sections = []
+        for key in keys:
+            section = cache.get(key)
+            if section is not None:
+                cache.move_to_end(key)
+            sections.append(section)
+        return sections
+
+
+def store_cached_sections(entries):
+    """
+    Add sections to the on-disk cache, evicting the least recently used ones.
     
-    Raises:
-        ValueError: If report is None or empty, or filename is invalid
-        OSError: If there are file system related errors
+    The file is rewritten through a temporary file and os.replace, so readers
+    never see a partially written cache.
+    
+    Args:
+        entries (dict): Mapping of cache key to markdown section
     """
-    # Input validation
-    if not report or not isinstance(report, str):
-        raise ValueError("Report must be a non-empty string")
+    if not entries:
+        return
+    
+    with _section_cache_lock:
+        cache = _load_section_cache()
+        for key, section in entries.items():
+            cache[key] = section
+            cache.move_to_end(key)
+        while len(cache) > SECTION_CACHE_SIZE:
+            cache.popitem(last=False)
+        
+        try:
+            SECTION_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=SECTION_CACHE_PATH.parent, suffix=".tmp")
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(orjson.dumps(cache))
+                os.replace(tmp_path, SECTION_CACHE_PATH)
+            except BaseException:
+                # A failed cleanup must not hide the error that got us here
+                with contextlib.suppress(FileNotFoundError):
+                    os.unlink(tmp_path)
+                raise
+        except OSError as e:
+            # The cache is an optimization; a read-only home must not fail the report
+            log.warning("Could not write section cache: %s", e)
+
+
+async def _cached_ai_call(key, make_call):
+    """
+    Return the cached AI response for key, calling make_call() on a miss.
     
-    if not filename or not isinstance(filename, str):
-        raise ValueError("Filename must be a non-empty string")
+    Concurrent callers with the same key share a single in-flight call, so
+    identical comments submitted together only reach Gemini once.
+    
+    Args:
+        key (str): Cache key from _response_cache_key
+        make_call (callable): Zero-argument coroutine function returning the response text
+    
+    Returns:
+        str: The AI response text
+    """
+    cached = _ai_response_cache.get(key)
+    if cached is not None:
+        _ai_response_cache.move_to_end(key)
+        return cached
     
+    pending = _ai_inflight.get(key)
+    if pending is not None:
+        return await asyncio.shield(pending)
+    
+    future = asyncio.get_running_loop().create_future()
+    _ai_inflight[key] = future
     try:
-        # Convert to Path object for better path handling
-        file_path = Path(filename)
-        
-        # Create parent directories if they don't exist
-        file_path.parent.mkdir(parents=True, exist_ok=True)
-        
-        # Write the markdown content to file
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(report)
-        
-        print(f"Markdown report successfully saved to: {file_path.absolute()}")
-        return True
-        
-    except PermissionError as e:
-        print(f"Permission denied: Unable to write to {filename}")
-        print(f"Error details: {e}")
-        return False
-        
-    except FileNotFoundError as e:
-        print(f"Invalid file path: {filename}")
-        print(f"Error details: {e}")
-        return False
-        
-    except OSError as e:
-        print(f"File system error occurred while saving to {filename}")
-        print(f"Error details: {e}")
-        return False
-        
-    except Exception as e:
-        print(f"Unexpected error occurred while saving markdown report")
-        print(f"Error details: {e}")
-        return False
-
-
-def generate_full_report(review_data):
+        text = await make_call()
+    except BaseException as e:
+        # Hand the failure to any waiters; cancellation is reported as a plain error
+        future.set_exception(e if isinstance(e, Exception) else RuntimeError("AI call was cancelled"))
+        future.exception()  # mark as retrieved when nobody else is waiting
+        raise
+    finally:
+        _ai_inflight.pop(key, None)
+    
+    future.set_result(text)
+    _ai_response_cache[key] = text
+    if len(_ai_response_cache) > AI_RESPONSE_CACHE_SIZE:
+        _ai_response_cache.popitem(last=False)
+    return text
+
+
+async def generate_full_report(review_data, out: Optional[TextIO] = None):
     """
     Generate a complete Markdown report from review data.
     
+    Comments are sent to Gemini concurrently, so the total time is bounded by
+    the slowest response rather than the sum of all of them.
+    
+    When out is given, the report is written to it piece by piece as sections
+    become ready (in comment order) instead of being held in memory.
+    
     Args:
         review_data (dict): Dictionary containing 'code_snippet' and 'review_comments'
+        out (TextIO, optional): Writable text stream to receive the report
     
     Returns:
-        str: Complete Markdown report with all sections
+        str: Complete Markdown report with all sections, or None if out was given
     
     Raises:
         ValueError: If review_data is invalid
@@ -151,139 +329,198 @@ def generate_full_report(review_data):
     if not isinstance(code_snippet, str) or not isinstance(review_comments, list):
         raise ValueError("Invalid data types in review_data")
     
+    # Strip once here; the prompt builders below expect an already stripped snippet
+    code_snippet = code_snippet.strip()
+    n = len(review_comments)
+    
     # Initialize Gemini AI with optimized settings
     api_key = os.getenv('GEMINI_API_KEY')
     if not api_key:
-        print("Warning: GEMINI_API_KEY not set. Using simulated responses for demonstration.")
+        log.warning("GEMINI_API_KEY not set. Using simulated responses for demonstration.")
         use_ai = False
     else:
         try:
-            genai.configure(api_key=api_key)
-            # Configure model with faster settings
-            generation_config = {
-                "temperature": 0.7,
-                "top_p": 0.8,
-                "top_k": 40,
-                "max_output_tokens": 800,  # Reduced for faster generation
-                "response_mime_type": "text/plain",
-            }
-            model = genai.GenerativeModel(
-                model_name='gemini-1.5-flash',
-                generation_config=generation_config
-            )
+            # The model (and its open connection) is shared with the rest of the
+            # reviewer; our settings go with each request instead
+            model = get_model(api_key)
             use_ai = True
-            print("✅ Successfully connected to Gemini AI with optimized settings")
+            log.info("✅ Successfully connected to Gemini AI with optimized settings")
         except Exception as e:
-            print(f"Warning: Could not initialize Gemini AI: {e}")
-            print("Using simulated responses for demonstration.")
+            log.warning("Could not initialize Gemini AI: %s. Using simulated responses for demonstration.", e)
             use_ai = False
     
-    # Start building the report according to hackathon specifications
-    report = "# 🤖 Empathetic Code Review Report\n\n"
-    report += f"**Generated on:** {os.popen('date').read().strip()}\n"
-    report += f"**Tagline:** *Transforming Critical Feedback into Constructive Growth*\n\n"
+    # Start building the report according to hackathon specifications; pieces
+    # go straight to out, or are collected in a list and joined once at the end
+    parts = []
+    emit = out.write if out is not None else parts.append
+    
+    emit("# 🤖 Empathetic Code Review Report\n\n")
+    emit(f"**Generated on:** {datetime.now().strftime('%a %b %d %H:%M:%S %Y')}\n")
+    emit("**Tagline:** *Transforming Critical Feedback into Constructive Growth*\n\n")
     
     # Add code section
-    report += "## 📝 Code Under Review\n\n"
-    report += "```python\n"
-    report += code_snippet.strip() + "\n"
-    report += "```\n\n"
+    emit("## 📝 Code Under Review\n\n")
+    emit("```python\n")
+    emit(code_snippet + "\n")
+    emit("```\n\n")
     
     # Add summary
-    report += "## 📊 Summary\n\n"
-    report += f"This report analyzes **{len(review_comments)} review comment(s)** and transforms them into empathetic, "
-    report += "constructive guidance. Each comment has been reframed to focus on learning opportunities while "
-    report += "maintaining technical accuracy and providing clear explanations of the underlying principles.\n\n"
+    emit("## 📊 Summary\n\n")
+    emit(f"This report analyzes **{n} review comment(s)** and transforms them into empathetic, "
+         "constructive guidance. Each comment has been reframed to focus on learning opportunities while "
+         "maintaining technical accuracy and providing clear explanations of the underlying principles.\n\n")
     
     # Add detailed analysis section
-    report += "## 🎯 Detailed Analysis\n\n"
+    emit("## 🎯 Detailed Analysis\n\n")
+    
+    # Cap the number of concurrent Gemini calls
+    semaphore = asyncio.Semaphore(MAX_CONCURRENT_AI_CALLS)
+    
+    # Sections generated by the AI during this run, keyed by comment number,
+    # to be written back to the on-disk cache (fallbacks are never cached)
+    fresh_sections = {}
     
     # Process comments concurrently for faster generation
-    def process_single_comment(comment_data):
+    async def process_single_comment(comment_data):
         i, comment = comment_data
-        print(f"Processing comment {i}/{len(review_comments)}: {comment}")
+        log.info("Processing comment %d/%d: %s", i, n, comment)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + AI_CALL_TIMEOUT_SECONDS
         
         # Generate AI prompt with hackathon specifications
         prompt = generate_enhanced_ai_prompt(code_snippet, comment)
         
         # Get AI response (real or simulated)
+        from_ai = False
         if use_ai:
+            async def request():
+                # Stream the reply so chunks are received while the rest is
+                # still being generated, then join them once
+                async with semaphore:
+                    response = await model.generate_content_async(prompt, generation_config=_GEN_CONFIG, stream=True)
+                    chunks = [chunk.text async for chunk in response]
+                return "".join(chunks)
+            
+            async def call_model():
+                return await asyncio.wait_for(request(), timeout=max(0.0, deadline - loop.time()))
+            
             try:
                 start_time = time.time()
-                response = model.generate_content(prompt)
-                ai_response = response.text
+                ai_response = await _cached_ai_call(_response_cache_key(code_snippet, comment), call_model)
                 duration = time.time() - start_time
-                print(f"✅ Received AI response for comment {i} ({duration:.1f}s)")
+                log.info("✅ Received AI response for comment %d (%.1fs)", i, duration)
+                from_ai = True
             except Exception as e:
-                print(f"Error getting AI response for comment {i}: {e}")
+                log.warning("Error getting AI response for comment %d: %s", i, e)
                 ai_response = create_enhanced_fallback_response(comment, code_snippet)
         else:
             # Enhanced simulated response that follows hackathon format
             ai_response = create_enhanced_simulated_response(comment, code_snippet)
         
-        # Create markdown section with proper formatting
-        markdown_section = create_enhanced_markdown_section(comment, ai_response)
+        # Create markdown section with proper formatting; a response that can't
+        # be formatted is replaced inline so one bad comment never fails the report
+        try:
+            markdown_section = create_enhanced_markdown_section(comment, ai_response)
+        except Exception as e:
+            log.warning("Error processing comment %d: %s", i, e)
+            markdown_section = create_enhanced_markdown_section(comment, create_enhanced_fallback_response(comment, code_snippet))
+            from_ai = False
+        if from_ai:
+            fresh_sections[i] = markdown_section
         return i, markdown_section
     
+    sections = [None] * n
+    next_section = 0
+    
+    def emit_ready_sections():
+        """Emit the finished sections at the front of the report, releasing them"""
+        nonlocal next_section
+        while next_section < n and sections[next_section] is not None:
+            emit(sections[next_section])
+            sections[next_section] = ""
+            next_section += 1
+    
+    # Reuse sections generated for the same code and comment on earlier runs
+    if use_ai:
+        section_keys = [_section_cache_key(code_snippet, comment) for comment in review_comments]
+        sections = await asyncio.get_running_loop().run_in_executor(None, lookup_cached_sections, section_keys)
+        cache_hits = sum(section is not None for section in sections)
+        if cache_hits:
+            log.info("💾 Reusing %d cached section(s)", cache_hits)
+        emit_ready_sections()
+    
+    pending = [(i, comment) for i, comment in enumerate(review_comments, 1) if sections[i - 1] is None]
+    
+    # Ask for every comment in one request first; one round trip beats N
+    batched_sections = None
+    if use_ai and len(pending) > 1:
+        log.info("🚀 Requesting feedback for %d comments in one batch...", len(pending))
+        start_time = time.time()
+        try:
+            batched_sections = await generate_batched_sections(model, code_snippet, [comment for _, comment in pending])
+            log.info("⚡ Batched response received in %.1fs", time.time() - start_time)
+        except Exception as e:
+            log.warning("Batched request failed, falling back to per-comment requests: %s", e)
+    
+    if batched_sections is not None:
+        for position, markdown_section in batched_sections.items():
+            i = pending[position - 1][0]
+            sections[i - 1] = fresh_sections[i] = markdown_section
+        emit_ready_sections()
+        
+        # Only comments the batch missed go through the per-comment path
+        pending = [(i, comment) for i, comment in pending if sections[i - 1] is None]
+        if pending:
+            log.info("Batched response missed %d comment(s), requesting them individually", len(pending))
+    
     # Process comments in parallel for faster execution
-    if use_ai and len(review_comments) > 1:
-        print(f"🚀 Processing {len(review_comments)} comments concurrently...")
+    pending_count = len(pending)
+    if use_ai and pending_count > 1:
+        log.info("🚀 Processing %d comments concurrently...", pending_count)
         start_time = time.time()
         
-        with ThreadPoolExecutor(max_workers=min(3, len(review_comments))) as executor:
-            # Submit all tasks
-            comment_data = [(i, comment) for i, comment in enumerate(review_comments, 1)]
-            future_to_comment = {executor.submit(process_single_comment, data): data for data in comment_data}
-            
-            # Collect results in order
-            results = {}
-            for future in as_completed(future_to_comment):
-                try:
-                    i, markdown_section = future.result(timeout=30)  # 30 second timeout per comment
-                    results[i] = markdown_section
-                except Exception as e:
-                    comment_data = future_to_comment[future]
-                    i, comment = comment_data
-                    print(f"Error processing comment {i}: {e}")
-                    # Fallback response
-                    results[i] = create_enhanced_markdown_section(comment, create_enhanced_fallback_response(comment, code_snippet))
-            
-            # Add results in order
-            for i in range(1, len(review_comments) + 1):
-                report += results.get(i, "")
+        # Take sections in completion order; emit_ready_sections acts as the
+        # reorder buffer, writing each one once every earlier comment is done
+        for next_done in asyncio.as_completed([process_single_comment(data) for data in pending]):
+            i, markdown_section = await next_done
+            sections[i - 1] = markdown_section
+            emit_ready_sections()
         
         total_time = time.time() - start_time
-        print(f"⚡ Completed all comments in {total_time:.1f}s (avg: {total_time/len(review_comments):.1f}s per comment)")
+        log.info("⚡ Completed all comments in %.1fs (avg: %.1fs per comment)", total_time, total_time / pending_count)
     else:
         # Sequential processing for single comment or fallback
-        for i, comment in enumerate(review_comments, 1):
-            markdown_section = process_single_comment((i, comment))[1]
-            report += markdown_section
+        for comment_data in pending:
+            i, markdown_section = await process_single_comment(comment_data)
+            sections[i - 1] = markdown_section
+            emit_ready_sections()
+    
+    if fresh_sections:
+        await asyncio.get_running_loop().run_in_executor(
+            None, store_cached_sections,
+            {section_keys[i - 1]: section for i, section in fresh_sections.items()}
+        )
     
     # Add holistic summary as per hackathon requirements
-    report += "\n## 🎉 Holistic Summary\n\n"
-    report += "**Excellent work on your code!** The suggestions above represent opportunities to elevate your already solid foundation. "
-    report += "Each recommendation focuses on fundamental software development principles like performance optimization, code readability, "
-    report += "and maintainability. Remember, even experienced developers constantly refine their code - it's a sign of growth, not weakness. "
-    report += "These improvements will make your code more professional, efficient, and easier for your future self and teammates to understand. "
-    report += "Keep up the fantastic work and continue embracing the learning journey! 🚀\n\n"
+    emit(HOLISTIC_SUMMARY)
     
     # Add footer
-    report += "---\n"
-    report += "*Report generated by Empathetic Code Reviewer | Transforming Critical Feedback into Constructive Growth*\n"
+    emit(REPORT_FOOTER)
     
-    return report
+    return "".join(parts) if out is None else None
 
 
+@lru_cache(maxsize=512)
 def generate_enhanced_ai_prompt(code_snippet: str, comment: str) -> str:
     """
     Generate an optimized AI prompt for faster processing.
+    code_snippet is expected to be stripped already.
     """
     prompt = f"""Transform this code review comment into empathetic feedback:
 
 **Code:**
 ```python
-{code_snippet.strip()}
+{code_snippet}
 ```
 
 **Critical comment:** {comment.strip()}
@@ -298,12 +535,105 @@ Keep response concise but helpful. Use encouraging tone. Include practical code
     return prompt
 
 
+def generate_batched_ai_prompt(code_snippet: str, comments: List[str]) -> str:
+    """
+    Generate one prompt covering every comment, asking for a JSON reply.
+    code_snippet is expected to be stripped already.
+    """
+    numbered_comments = "\n".join(f"{i}. {comment.strip()}" for i, comment in enumerate(comments, 1))
+    
+    prompt = f"""Transform each of these code review comments into empathetic feedback:
+
+**Code:**
+```python
+{code_snippet}
+```
+
+**Critical comments:**
+{numbered_comments}
+
+For every comment provide:
+- i: the comment's number from the list above
+- rephrasing: an encouraging version of the comment
+- why: the principle behind it, explained briefly
+- code: a practical Python code example showing the fix (code only, no fences)
+
+Reply with JSON only, in the form:
+{{"responses": [{{"i": 1, "rephrasing": "...", "why": "...", "code": "..."}}]}}
+
+The "responses" array must contain one object for each of the {len(comments)} comments. Keep each one concise but helpful."""
+
+    return prompt
+
+
+async def generate_batched_sections(model, code_snippet: str, review_comments: List[str]) -> Dict[int, str]:
+    """
+    Request feedback for all comments in a single Gemini call.
+    
+    Entries are matched to comments by their "i" field, so a reply that skips
+    or reorders comments still yields every section it does contain.
+    
+    Returns:
+        dict: Markdown section for each answered comment, keyed by its 1-based position
+    
+    Raises:
+        ValueError: If the reply holds no usable entries
+        Exception: If the AI API call fails
+    """
+    prompt = generate_batched_ai_prompt(code_snippet, review_comments)
+    generation_config = {
+        **_GEN_CONFIG,
+        "response_mime_type": "application/json",
+        "max_output_tokens": min(BATCH_TOKENS_PER_COMMENT * len(review_comments), MAX_BATCH_OUTPUT_TOKENS),
+    }
+    response = await asyncio.wait_for(
+        model.generate_content_async(prompt, generation_config=generation_config),
+        timeout=BATCH_TIMEOUT_SECONDS
+    )
+    
+    payload = orjson.loads(response.text)
+    items = payload.get("responses") if isinstance(payload, dict) else payload
+    if not isinstance(items, list):
+        raise ValueError("Batched AI response does not contain a list of entries")
+    
+    sections = {}
+    for item in items:
+        if not isinstance(item, dict):
+            continue
+        try:
+            position = int(item.get("i"))
+        except (TypeError, ValueError):
+            continue
+        if not 1 <= position <= len(review_comments) or position in sections:
+            continue
+        
+        rephrasing = str(item.get("rephrasing") or "").strip()
+        why = str(item.get("why") or "").strip()
+        code = str(item.get("code") or "").strip()
+        if not (rephrasing or why or code):
+            continue
+        
+        sections[position] = format_markdown_section(
+            review_comments[position - 1],
+            rephrasing or "Great observation! Here's an opportunity to enhance your code.",
+            why,
+            f"```python\n{code}\n```" if code else ""
+        )
+    
+    if not sections:
+        raise ValueError("Batched AI response contains no usable entries")
+    return sections
+
+
+@lru_cache(maxsize=512)
 def create_enhanced_simulated_response(comment: str, code_snippet: str) -> str:
     """
     Create a high-quality simulated response that follows hackathon requirements.
     """
+    comment_lower = comment.lower()
+    
     # Enhanced responses based on common code review patterns
-    if "inefficient" in comment.lower() or "performance" in comment.lower():
+    if _SIMULATED_PERF_RE.search(comment_lower):
         return """Positive Rephrasing: Great start on the logic here! For better performance, especially with larger datasets, we can make this more efficient by optimizing our approach.
 
 The 'Why': When working with collections, the way we iterate and filter can significantly impact performance. List comprehensions and built-in functions are often more efficient because they're optimized at the C level in Python, making them faster than manual loops for most operations.
@@ -315,7 +645,7 @@ def get_active_users(users):
 ```
 This approach combines filtering and collection in a single, readable operation that's typically faster and more Pythonic."""
 
-    elif "variable" in comment.lower() and ("name" in comment.lower() or "bad" in comment.lower()):
+    elif "variable" in comment_lower and _SIMULATED_NAMING_RE.search(comment_lower):
         return """Positive Rephrasing: Nice work on the functionality! Let's enhance readability by using more descriptive variable names - this is one of those small changes that makes a huge difference for code maintenance.
 
 The 'Why': Clear variable names are crucial for code maintainability. When we return to code months later, or when teammates review it, descriptive names immediately communicate intent. This reduces cognitive load and prevents bugs caused by misunderstanding variable purposes.
@@ -330,7 +660,7 @@ def process_data(data):
 ```
 Even better, consider what the variable represents: if it's user data, call it 'user'; if it's a number, call it 'value' or 'number'."""
 
-    elif "docstring" in comment.lower() or "documentation" in comment.lower():
+    elif _SIMULATED_DOC_RE.search(comment_lower):
         return """Positive Rephrasing: Excellent implementation! Adding documentation will make this professional-grade code that any developer (including your future self) will appreciate.
 
 The 'Why': Documentation serves as a contract for your function, explaining what it does, what it expects, and what it returns. This is essential for team collaboration, code maintenance, and following Python conventions (PEP 257). Good docs prevent bugs and save hours of code-reading time.
@@ -351,7 +681,7 @@ def calculate_area(radius):
 ```
 This follows Python documentation standards and makes your code self-explanatory."""
 
-    elif "boolean" in comment.lower() and "true" in comment.lower():
+    elif "boolean" in comment_lower and "true" in comment_lower:
         return """Positive Rephrasing: Great logic structure! We can make this even cleaner by leveraging Python's natural boolean evaluation - it's a neat language feature that makes code more readable.
 
 The 'Why': In Python, comparing boolean values to True/False is redundant because the values are already boolean. Removing '== True' makes code more concise and follows Python's principle of readability. It also prevents potential issues if the value isn't exactly True but is truthy.
@@ -385,56 +715,60 @@ def create_enhanced_markdown_section(original_comment: str, ai_response: str) ->
     Create a properly formatted markdown section following hackathon specifications.
     """
     # Parse AI response to extract components
-    lines = ai_response.strip().split('\n')
-    positive_rephrasing = ""
-    why_explanation = ""
-    suggested_improvement = ""
-    
-    current_section = None
-    code_block = []
-    in_code_block = False
-    
-    for line in lines:
-        line = line.strip()
-        
-        if line.startswith("Positive Rephrasing:"):
-            current_section = "positive"
-            positive_rephrasing = line.replace("Positive Rephrasing:", "").strip()
-        elif line.startswith("The 'Why':"):
-            current_section = "why"
-            why_explanation = line.replace("The 'Why':", "").strip()
-        elif line.startswith("Suggested Improvement:"):
-            current_section = "improvement"
-            suggested_improvement = line.replace("Suggested Improvement:", "").strip()
-        elif line.startswith("```"):
-            if in_code_block:
-                in_code_block = False
-                if code_block:
-                    suggested_improvement += "\n```python\n" + "\n".join(code_block) + "\n```"
-                    code_block = []
-            else:
-                in_code_block = True
-        elif in_code_block:
-            code_block.append(line)
-        elif line and current_section:
-            if current_section == "positive" and not positive_rephrasing:
-                positive_rephrasing = line
-            elif current_section == "positive":
-                positive_rephrasing += " " + line
-            elif current_section == "why" and not why_explanation:
-                why_explanation = line
-            elif current_section == "why":
-                why_explanation += " " + line
-            elif current_section == "improvement" and not suggested_improvement:
-                suggested_improvement = line
-            elif current_section == "improvement" and not line.startswith("```"):
-                suggested_improvement += " " + line
+    match = _SECTION_RE.search(ai_response)
+    if match:
+        positive_rephrasing = _join_lines(match.group('pos'))
+        why_explanation = _join_lines(match.group('why') or "")
+        suggested_improvement = _format_improvement(match.group('imp') or "")
+    else:
+        positive_rephrasing = why_explanation = suggested_improvement = ""
     
     # Fallback parsing if structured parsing fails
     if not positive_rephrasing:
         sentences = ai_response.split('.')
         positive_rephrasing = sentences[0] + "." if sentences else "Great observation! Here's an opportunity to enhance your code."
     
+    return format_markdown_section(original_comment, positive_rephrasing, why_explanation, suggested_improvement)
+
+
+def _join_lines(text: str) -> str:
+    """Collapse a multi-line text part into one line, dropping blank lines."""
+    return " ".join(line.strip() for line in text.splitlines() if line.strip())
+
+
+def _format_improvement(text: str) -> str:
+    """
+    Normalise the improvement part: prose is collapsed onto single lines and
+    every code block is re-fenced as python. An unclosed fence is closed.
+    """
+    pieces = _FENCE_RE.split(text)
+    
+    # Anything after a fence that never closes is still code
+    tail = pieces[-1]
+    fence = tail.find("```")
+    if fence != -1:
+        pieces[-1:] = [tail[:fence], tail[fence:].partition("\n")[2]]
+    
+    parts = []
+    for index, piece in enumerate(pieces):
+        if index % 2:
+            code = piece.strip("\n")
+            if code.strip():
+                parts.append(f"\n```python\n{code}\n```")
+        else:
+            prose = _join_lines(piece)
+            if prose:
+                # Prose after a code block starts its own paragraph; text on
+                # the closing ``` line would keep the fence open
+                parts.append("\n\n" + prose if parts else prose)
+    return "".join(parts)
+
+
+def format_markdown_section(original_comment: str, positive_rephrasing: str, why_explanation: str, suggested_improvement: str) -> str:
+    """
+    Format the parts of one analysed comment as a report section.
+    Empty explanation or improvement parts are replaced with generic text.
+    """
     if not why_explanation:
         why_explanation = "This improvement enhances code quality by following software development best practices and principles."
     
@@ -465,7 +799,7 @@ def create_enhanced_fallback_response(comment: str, code_snippet: str) -> str:
     comment_lower = comment.lower()
     
     # Efficiency/Performance related comments
-    if any(word in comment_lower for word in ['inefficient', 'performance', 'slow', 'loop', 'optimize']):
+    if _FALLBACK_PERF_RE.search(comment_lower):
         if 'get_active_users' in code_snippet:
             return """Positive Rephrasing: Great start on the logic here! For better performance, especially with large user lists, we can make this more efficient by combining the filtering operations.
 
@@ -490,7 +824,7 @@ Suggested Improvement:
 Performance improvements often involve choosing the right data structures and algorithms for the task."""
 
     # Variable naming issues
-    elif any(word in comment_lower for word in ['variable', 'name', 'naming', "'u'"]):
+    elif _FALLBACK_NAMING_RE.search(comment_lower):
         return """Positive Rephrasing: Nice work on the functionality! Let's enhance readability with more descriptive variable names - this small change makes a huge difference for code maintenance.
 
 The 'Why': Clear variable names are one of the most important aspects of clean code. When you or a teammate returns to this code months later, descriptive names immediately communicate intent and reduce the time needed to understand the logic. Good naming prevents bugs and makes code self-documenting.
@@ -507,7 +841,7 @@ def get_active_users(users):
 Using 'user' instead of 'u' immediately tells us what we're working with. This follows the principle that code is read far more often than it's written."""
 
     # Boolean comparison issues
-    elif any(word in comment_lower for word in ['boolean', 'true', 'false', 'redundant', '== true']):
+    elif _FALLBACK_BOOL_RE.search(comment_lower):
         return """Positive Rephrasing: Great logic structure! We can make this even cleaner by leveraging Python's natural boolean evaluation - it's one of those elegant language features that makes code more readable.
 
 The 'Why': In Python, boolean values are already True or False, so comparing them to True/False is redundant. This follows Python's principle of readability and can prevent subtle bugs if the value is truthy but not exactly True. It also makes the code more concise and idiomatic.
@@ -524,7 +858,7 @@ def get_active_users(users):
 Python's boolean evaluation naturally handles this, making the code cleaner and following the Zen of Python: "Simple is better than complex."""
 
     # Documentation/docstring issues
-    elif any(word in comment_lower for word in ['docstring', 'documentation', 'comment', 'document']):
+    elif _FALLBACK_DOC_RE.search(comment_lower):
         return """Positive Rephrasing: Excellent implementation! Adding documentation will transform this into professional-grade code that any developer (including your future self) will appreciate.
 
 The 'Why': Documentation serves as a contract for your function, clearly stating what it does, what it expects, and what it returns. This is essential for team collaboration, code maintenance, and follows Python conventions (PEP 257). Good documentation prevents bugs and saves hours of code-reading time.
@@ -570,10 +904,11 @@ def main():
     """
     Main function that orchestrates the complete workflow:
     1. Reads input JSON using read_input_json()
-    2. Calls generate_full_report() to produce the Markdown report
-    3. Saves the report using save_markdown_report()
-    4. Prints a success message with the filename of the generated report
+    2. Calls generate_full_report() to stream the Markdown report into the output file
+    3. Prints a success message with the filename of the generated report
     """
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    
     try:
         # Step 1: Read input JSON
         input_filename = "sample_review.json"
@@ -597,36 +932,39 @@ def get_user_input():
                 ]
             }
             
-            import json
-            with open(input_filename, 'w') as f:
-                json.dump(sample_data, f, indent=2)
+            with open(input_filename, 'wb') as f:
+                f.write(orjson.dumps(sample_data, option=orjson.OPT_INDENT_2))
             print(f"Created sample data in '{input_filename}'")
         
         review_data = read_input_json(input_filename)
         print(f"✓ Successfully loaded review data with {len(review_data['review_comments'])} comments")
         
-        # Step 2: Generate the full report
-        print("\nStep 2: Generating full Markdown report...")
-        markdown_report = generate_full_report(review_data)
-        print("✓ Successfully generated complete Markdown report")
-        
-        # Step 3: Save the report
+        # Step 2: Generate the full report straight into the output file
         output_filename = "empathetic_code_review_report.md"
-        print(f"\nStep 3: Saving report to '{output_filename}'...")
+        print(f"\nStep 2: Generating full Markdown report into '{output_filename}'...")
         
-        success = save_markdown_report(markdown_report, output_filename)
+        try:
+            with open(output_filename, 'w', encoding='utf-8', buffering=1 << 20) as f:
+                asyncio.run(generate_full_report(review_data, out=f))
+            success = True
+        except OSError as e:
+            print(f"File system error occurred while saving to {output_filename}")
+            print(f"Error details: {e}")
+            success = False
         
         if success:
-            # Step 4: Print success message
+            # Step 3: Print success message
             print(f"\n🎉 SUCCESS! Code review report has been generated and saved.")
             print(f"📄 Report filename: {output_filename}")
             print(f"📊 Report contains {len(review_data['review_comments'])} detailed analyses")
             print(f"📍 Full path: {os.path.abspath(output_filename)}")
             
             # Show a preview of the report
+            with open(output_filename, encoding='utf-8') as f:
+                preview = f.read(301)
             print(f"\n📋 Report Preview (first 300 characters):")
             print("-" * 50)
-            print(markdown_report[:300] + "..." if len(markdown_report) > 300 else markdown_report)
+            print(preview[:300] + "..." if len(preview) > 300 else preview)
             print("-" * 50)
             
         else:
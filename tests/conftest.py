@@ -0,0 +1,14 @@
+"""
+pytest configuration: make the application sources importable
+"""
+
+import sys
+from pathlib import Path
+
+SRC_DIR = Path(__file__).resolve().parent.parent / "src"
+
+# The test scripts import the reviewer module directly (empathetic_code_reviewer)
+# and the rest of the code through the core package (core.save_markdown_report)
+for path in (SRC_DIR, SRC_DIR / "core"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
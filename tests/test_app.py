@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""
+Tests for the HTML rendering of generated reports in the web app
+"""
+
+import asyncio
+import pytest
+
+pytest.importorskip("fastapi")
+pytest.importorskip("cmarkgfm")
+
+from app import markdown_to_html
+from core.save_markdown_report import generate_full_report
+
+
+REVIEW_DATA = {
+    "code_snippet": "def get_active_users(users):\n    return [u for u in users if u.is_active == True]",
+    "review_comments": [
+        "This loop is inefficient",
+        "Bad variable names like 'u'",
+        "Missing docstring",
+        "Boolean compared with True",
+        "Consider error handling",
+    ],
+}
+
+
+def test_full_report_renders_one_section_per_comment(monkeypatch):
+    """Every comment section and the closing summary render as headings, not code."""
+    monkeypatch.delenv("GEMINI_API_KEY", raising=False)
+    report = asyncio.run(generate_full_report(REVIEW_DATA))
+    
+    html = markdown_to_html(report)
+    
+    assert html.count("<h3>") == len(REVIEW_DATA["review_comments"])
+    assert "<h2>🎉 Holistic Summary</h2>" in html
+    # A fence left open would show the markdown source of later sections as code
+    assert "### " not in html
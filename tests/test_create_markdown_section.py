@@ -3,21 +3,18 @@
 Test script for the create_markdown_section function
 """
 
+from pathlib import Path
+import time
+import pytest
 from empathetic_code_reviewer import create_markdown_section
 
 
-def test_create_markdown_section():
-    """
-    Test the create_markdown_section function with various AI responses.
-    """
-    print("Testing create_markdown_section function...\n")
-    
-    # Test cases with different AI response formats
-    test_cases = [
-        {
-            "name": "Well-structured AI response",
-            "original_comment": "Don't use hardcoded 3.14, use math.pi instead",
-            "ai_response": """Great effort on implementing the area calculation! Here's an opportunity to enhance the precision and follow Python conventions.
+# Test cases with different AI response formats, as (name, original_comment, ai_response)
+_TEST_CASES = (
+    (
+        "Well-structured AI response",
+        "Don't use hardcoded 3.14, use math.pi instead",
+        """Great effort on implementing the area calculation! Here's an opportunity to enhance the precision and follow Python conventions.
 
 This helps improve accuracy because math.pi provides higher precision than the hardcoded 3.14, which is crucial for mathematical calculations.
 
@@ -30,12 +27,12 @@ def calculate_area(radius):
     return math.pi * radius * radius
 ```
 
-This change makes your code more precise and follows Python best practices!"""
-        },
-        {
-            "name": "Simple AI response",
-            "original_comment": "Missing input validation",
-            "ai_response": """Consider adding input validation to make your function more robust. This improves error handling and user experience. Here's how you can enhance it:
+This change makes your code more precise and follows Python best practices!""",
+    ),
+    (
+        "Simple AI response",
+        "Missing input validation",
+        """Consider adding input validation to make your function more robust. This improves error handling and user experience. Here's how you can enhance it:
 
 ```python
 def get_user_age():
@@ -48,34 +45,38 @@ def get_user_age():
                 print("Please enter a positive number.")
         except ValueError:
             print("Please enter a valid number.")
-```"""
-        },
-        {
-            "name": "AI response without clear code block",
-            "original_comment": "Function lacks documentation",
-            "ai_response": """Your function works well! Adding documentation would enhance readability and help other developers understand your code better. Documentation improves maintainability and follows Python conventions. You could add a docstring explaining what the function does, its parameters, and return value."""
-        },
-        {
-            "name": "Minimal AI response",
-            "original_comment": "No error handling",
-            "ai_response": """Add try-catch blocks for better error handling. This improves robustness."""
-        }
-    ]
-    
-    for i, test_case in enumerate(test_cases, 1):
+```""",
+    ),
+    (
+        "AI response without clear code block",
+        "Function lacks documentation",
+        """Your function works well! Adding documentation would enhance readability and help other developers understand your code better. Documentation improves maintainability and follows Python conventions. You could add a docstring explaining what the function does, its parameters, and return value.""",
+    ),
+    (
+        "Minimal AI response",
+        "No error handling",
+        """Add try-catch blocks for better error handling. This improves robustness.""",
+    ),
+)
+
+
+def demo_create_markdown_section():
+    """
+    Test the create_markdown_section function with various AI responses.
+    """
+    print("Testing create_markdown_section function...\n")
+    
+    for i, (name, original_comment, ai_response) in enumerate(_TEST_CASES, 1):
         print(f"{'='*80}")
-        print(f"TEST {i}: {test_case['name']}")
+        print(f"TEST {i}: {name}")
         print(f"{'='*80}")
         
         print("Input:")
-        print(f"Original Comment: {test_case['original_comment']}")
-        print(f"AI Response: {test_case['ai_response']}")
+        print(f"Original Comment: {original_comment}")
+        print(f"AI Response: {ai_response}")
         print("\n" + "-"*60)
         
-        markdown_section = create_markdown_section(
-            test_case['original_comment'], 
-            test_case['ai_response']
-        )
+        markdown_section = create_markdown_section(original_comment, ai_response)
         
         print("Generated Markdown Section:")
         print(markdown_section)
@@ -84,6 +85,84 @@ def get_user_age():
     print("All test cases completed!")
 
 
+# Parts create_markdown_section should pull out of each test case, keyed by
+# case name, as (rephrasing, why, a line of the code block or None if there is none)
+_EXPECTED_PARTS = {
+    "Well-structured AI response": (
+        "Here's an opportunity to enhance the precision and follow Python conventions.",
+        "This helps improve accuracy because math.pi provides higher precision than the hardcoded 3.14, which is crucial for mathematical calculations.",
+        "    return math.pi * radius * radius",
+    ),
+    "Simple AI response": (
+        "Consider adding input validation to make your function more robust.",
+        "This improves error handling and user experience.",
+        '            age = int(input("Enter your age: "))',
+    ),
+    "AI response without clear code block": (
+        "Adding documentation would enhance readability and help other developers understand your code better.",
+        "Documentation improves maintainability and follows Python conventions.",
+        None,
+    ),
+    "Minimal AI response": (
+        "Add try-catch blocks for better error handling.",
+        "This improves robustness.",
+        None,
+    ),
+}
+
+_CODE_PLACEHOLDER = "# Improved code example would be provided by the AI response"
+
+
+@pytest.mark.parametrize("name,original_comment,ai_response", _TEST_CASES, ids=[case[0] for case in _TEST_CASES])
+def test_section_contains_extracted_parts(name, original_comment, ai_response):
+    """The rephrasing, 'Why' and code of each response land on their own lines."""
+    rephrasing, why, code_line = _EXPECTED_PARTS[name]
+    
+    markdown_section = create_markdown_section(original_comment, ai_response)
+    
+    assert markdown_section.startswith(f'---\n### Analysis of Comment: "{original_comment}"\n')
+    assert f"* **Positive Rephrasing:** {rephrasing}\n" in markdown_section
+    assert f"* **The 'Why':** {why}\n" in markdown_section
+    if code_line is None:
+        assert f"```python\n{_CODE_PLACEHOLDER}\n```" in markdown_section
+    else:
+        assert f"\n{code_line}\n" in markdown_section
+        assert _CODE_PLACEHOLDER not in markdown_section
+
+
+@pytest.mark.parametrize("fence", ["```python", "```py", "```"], ids=["python", "py", "untagged"])
+def test_python_code_block_fences(fence):
+    """Python code is picked up whether its fence is tagged python, py or not at all."""
+    ai_response = f"Consider using math.pi for better precision.\n\n{fence}\nimport math\nprint(math.pi)\n```"
+    
+    markdown_section = create_markdown_section("Use math.pi", ai_response)
+    
+    assert "```python\nimport math\nprint(math.pi)\n```" in markdown_section
+
+
+def test_other_language_fence_is_ignored():
+    """A block fenced for another language is not reported as the Python improvement."""
+    ai_response = "Consider validating the input first.\n\n```javascript\nconsole.log(1)\n```"
+    
+    markdown_section = create_markdown_section("Validate input", ai_response)
+    
+    assert "console.log" not in markdown_section
+    assert _CODE_PLACEHOLDER in markdown_section
+
+
+@pytest.mark.parametrize("ai_response", [
+    "x" * 50_000,
+    "x = a.b + c.d " * 4_000,
+    ("Consider this because it helps " * 30 + ". ") * 250,
+], ids=["no periods", "code-like line", "long sentences"])
+def test_large_response_is_parsed_quickly(ai_response):
+    """Parsing time grows linearly with the response, even without sentence breaks."""
+    start = time.perf_counter()
+    create_markdown_section("Large response", ai_response)
+    
+    assert time.perf_counter() - start < 1.0
+
+
 def demo_full_workflow():
     """
     Demonstrate a complete workflow from comment to markdown.
@@ -131,13 +210,11 @@ This enhancement makes your code much more robust and professional!"""
     print(markdown)
     
     # Also save to file for demonstration
-    with open("sample_markdown_output.md", "w") as f:
-        f.write("# Code Review Feedback\n\n")
-        f.write(markdown)
+    Path("sample_markdown_output.md").write_bytes(("# Code Review Feedback\n\n" + markdown).encode("utf-8"))
     
     print("✓ Markdown also saved to 'sample_markdown_output.md'")
 
 
 if __name__ == "__main__":
-    test_create_markdown_section()
+    demo_create_markdown_section()
     demo_full_workflow()
@@ -3,54 +3,56 @@
 Test script for the generate_ai_prompt function
 """
 
+import pytest
 from empathetic_code_reviewer import generate_ai_prompt
 
 
-def test_generate_ai_prompt():
-    """
-    Test the generate_ai_prompt function with various code snippets and comments.
-    """
-    print("Testing generate_ai_prompt function...\n")
-    
-    # Test cases with different types of code issues
-    test_cases = [
-        {
-            "name": "Hardcoded values",
-            "code": """def calculate_area(radius):
+# Test cases with different types of code issues, as (name, code, comment)
+_TEST_CASES = (
+    (
+        "Hardcoded values",
+        """def calculate_area(radius):
     return 3.14 * radius * radius""",
-            "comment": "Don't use hardcoded 3.14, use math.pi instead"
-        },
-        {
-            "name": "Input validation",
-            "code": """def get_user_age():
+        "Don't use hardcoded 3.14, use math.pi instead",
+    ),
+    (
+        "Input validation",
+        """def get_user_age():
     age = input("Enter your age: ")
     return age""",
-            "comment": "This function doesn't validate input or convert to int"
-        },
-        {
-            "name": "Exception handling",
-            "code": """def divide_numbers(a, b):
+        "This function doesn't validate input or convert to int",
+    ),
+    (
+        "Exception handling",
+        """def divide_numbers(a, b):
     return a / b""",
-            "comment": "No error handling for division by zero"
-        },
-        {
-            "name": "Code documentation",
-            "code": """def process_data(data):
+        "No error handling for division by zero",
+    ),
+    (
+        "Code documentation",
+        """def process_data(data):
     result = []
     for item in data:
         if item > 0:
             result.append(item * 2)
     return result""",
-            "comment": "Missing docstring and unclear variable names"
-        }
-    ]
+        "Missing docstring and unclear variable names",
+    ),
+)
+
+
+def demo_generate_ai_prompt():
+    """
+    Test the generate_ai_prompt function with various code snippets and comments.
+    """
+    print("Testing generate_ai_prompt function...\n")
     
-    for i, test_case in enumerate(test_cases, 1):
+    for i, (name, code, comment) in enumerate(_TEST_CASES, 1):
         print(f"{'='*60}")
-        print(f"TEST {i}: {test_case['name']}")
+        print(f"TEST {i}: {name}")
         print(f"{'='*60}")
         
-        prompt = generate_ai_prompt(test_case['code'], test_case['comment'])
+        prompt = generate_ai_prompt(code, comment)
         
         print("Generated AI Prompt:")
         print("-" * 40)
@@ -61,6 +63,23 @@ def test_generate_ai_prompt():
     print("\nThe generated prompts are ready to send to Google Gemini or other LLMs.")
 
 
+@pytest.mark.parametrize("name,code,comment", _TEST_CASES, ids=[case[0] for case in _TEST_CASES])
+def test_prompt_embeds_code_and_comment(name, code, comment):
+    """The case's code is fenced as python and its comment is quoted as the critical comment."""
+    prompt = generate_ai_prompt(code, comment)
+    
+    assert f"**Code being reviewed:**\n```python\n{code}\n```" in prompt
+    assert f'**Original critical comment:** "{comment}"' in prompt
+    assert "{code}" not in prompt and "{comment}" not in prompt
+
+
+def test_prompt_strips_surrounding_whitespace():
+    """Blank lines and spaces around the inputs are not copied into the prompt."""
+    _, code, comment = _TEST_CASES[0]
+    
+    assert generate_ai_prompt(f"\n\n{code}\n  ", f"  {comment}\n") == generate_ai_prompt(code, comment)
+
+
 def demo_single_prompt():
     """
     Demonstrate a single prompt generation for clarity.
@@ -89,5 +108,5 @@ def demo_single_prompt():
 
 
 if __name__ == "__main__":
-    test_generate_ai_prompt()
+    demo_generate_ai_prompt()
     demo_single_prompt()
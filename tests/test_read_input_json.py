@@ -4,8 +4,13 @@ Test script for the read_input_json function
 """
 
 from empathetic_code_reviewer import read_input_json
+from pathlib import Path
+import io
 import json
-import os
+import orjson
+
+
+SAMPLE_REVIEW = Path(__file__).resolve().parent.parent / "examples" / "sample_review.json"
 
 
 def test_read_input_json():
@@ -16,13 +21,11 @@ def test_read_input_json():
     
     # Test 1: Valid JSON file
     print("Test 1: Reading valid JSON file")
-    try:
-        result = read_input_json("sample_review.json")
-        print(f"✓ Success! Loaded data with {len(result['review_comments'])} comments")
-        print(f"  Code snippet preview: {result['code_snippet'][:50]}...")
-        print()
-    except Exception as e:
-        print(f"✗ Error: {e}\n")
+    result = read_input_json(str(SAMPLE_REVIEW))
+    assert len(result['review_comments']) == 4
+    print(f"✓ Success! Loaded data with {len(result['review_comments'])} comments")
+    print(f"  Code snippet preview: {result['code_snippet'][:50]}...")
+    print()
     
     # Test 2: Non-existent file
     print("Test 2: Non-existent file")
@@ -37,63 +40,48 @@ def test_read_input_json():
     
     # Test 3: Invalid JSON
     print("Test 3: Invalid JSON file")
-    # Create a file with invalid JSON
-    with open("invalid.json", "w") as f:
-        f.write('{"code_snippet": "test", "review_comments": [invalid json}')
+    # In-memory file with invalid JSON
+    invalid_file = io.StringIO('{"code_snippet": "test", "review_comments": [invalid json}')
     
     try:
-        result = read_input_json("invalid.json")
+        result = read_input_json(invalid_file)
         print("✗ Should have failed!")
     except json.JSONDecodeError as e:
         print(f"✓ Correctly handled JSONDecodeError")
         print()
     except Exception as e:
         print(f"✗ Unexpected error: {e}\n")
-    finally:
-        # Clean up
-        if os.path.exists("invalid.json"):
-            os.remove("invalid.json")
     
     # Test 4: Missing required keys
     print("Test 4: Missing required keys")
-    # Create a file with missing keys
-    with open("missing_keys.json", "w") as f:
-        json.dump({"code_snippet": "test code"}, f)  # Missing review_comments
+    # In-memory file with missing keys
+    missing_keys_file = io.BytesIO(orjson.dumps({"code_snippet": "test code"}))  # Missing review_comments
     
     try:
-        result = read_input_json("missing_keys.json")
+        result = read_input_json(missing_keys_file)
         print("✗ Should have failed!")
     except KeyError as e:
         print(f"✓ Correctly handled missing key: {e}")
         print()
     except Exception as e:
         print(f"✗ Unexpected error: {e}\n")
-    finally:
-        # Clean up
-        if os.path.exists("missing_keys.json"):
-            os.remove("missing_keys.json")
     
     # Test 5: Wrong data types
     print("Test 5: Wrong data types")
-    # Create a file with wrong data types
-    with open("wrong_types.json", "w") as f:
-        json.dump({
-            "code_snippet": 123,  # Should be string
-            "review_comments": "not a list"  # Should be list
-        }, f)
+    # In-memory file with wrong data types
+    wrong_types_file = io.BytesIO(orjson.dumps({
+        "code_snippet": 123,  # Should be string
+        "review_comments": "not a list"  # Should be list
+    }))
     
     try:
-        result = read_input_json("wrong_types.json")
+        result = read_input_json(wrong_types_file)
         print("✗ Should have failed!")
     except ValueError as e:
         print(f"✓ Correctly handled wrong data type: {e}")
         print()
     except Exception as e:
         print(f"✗ Unexpected error: {e}\n")
-    finally:
-        # Clean up
-        if os.path.exists("wrong_types.json"):
-            os.remove("wrong_types.json")
     
     print("All tests completed!")
 
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""
+Tests for the canned responses in save_markdown_report
+"""
+
+import pytest
+from core.save_markdown_report import (
+    save_markdown_report,
+    create_enhanced_simulated_response,
+    create_enhanced_fallback_response,
+    create_enhanced_markdown_section,
+)
+
+
+CODE_SNIPPET = "def calculate_area(radius):\n    return 3.14 * radius * radius"
+
+# Opening words of each canned response, used to tell which one a comment got
+_OPENINGS = {
+    "Positive Rephrasing: Great start on the logic here!": "performance",
+    "Positive Rephrasing: Excellent logic foundation!": "performance",
+    "Positive Rephrasing: Nice work on the functionality!": "naming",
+    "Positive Rephrasing: Great logic structure!": "boolean",
+    "Positive Rephrasing: Excellent implementation!": "documentation",
+    "Positive Rephrasing: Solid work on this implementation!": "generic",
+    "Positive Rephrasing: Thank you for this valuable feedback!": "generic",
+}
+
+
+def _category(response):
+    """Name the canned response a comment was given."""
+    for opening, category in _OPENINGS.items():
+        if response.startswith(opening):
+            return category
+    raise AssertionError(f"Unknown response: {response[:60]}")
+
+
+# Keywords match as substrings, and the simulated responses need both words of
+# their naming and boolean checks, as (comment, expected category)
+_SIMULATED_CASES = (
+    ("This loop is inefficiently written", "performance"),
+    ("Loops are slow", "generic"),
+    ("Bad variable names", "naming"),
+    ("Variable is unused", "generic"),
+    ("Missing docstring", "documentation"),
+    ("Function is not documented", "generic"),
+    ("Boolean flag compared with True", "boolean"),
+    ("Redundant comparison", "generic"),
+)
+
+_FALLBACK_CASES = (
+    ("Loops are slow", "performance"),
+    ("Please optimize this", "performance"),
+    ("Poor naming", "naming"),
+    ("Rename 'u'", "naming"),
+    ("Redundant comparison", "boolean"),
+    ("if x == True is unnecessary", "boolean"),
+    ("This comment is outdated", "documentation"),
+    ("Function is not documented", "documentation"),
+    ("Consider error handling", "generic"),
+)
+
+
+@pytest.mark.parametrize("comment,expected", _SIMULATED_CASES)
+def test_simulated_response_category(comment, expected):
+    """Simulated responses are chosen by the keyword rules they have always used."""
+    assert _category(create_enhanced_simulated_response(comment, CODE_SNIPPET)) == expected
+
+
+@pytest.mark.parametrize("comment,expected", _FALLBACK_CASES)
+def test_fallback_response_category(comment, expected):
+    """Fallback responses are chosen by the keyword rules they have always used."""
+    assert _category(create_enhanced_fallback_response(comment, CODE_SNIPPET)) == expected
+
+
+def test_improvement_prose_follows_closed_fence():
+    """Text after a code block goes on its own line so the fence is closed."""
+    ai_response = create_enhanced_simulated_response("Loops are inefficient", CODE_SNIPPET)
+    
+    markdown_section = create_enhanced_markdown_section("Loops are inefficient", ai_response)
+    
+    assert "\n```\n\nThis approach combines filtering" in markdown_section
+    fence_lines = [line for line in markdown_section.splitlines() if line.startswith("```")]
+    assert fence_lines == ["```python", "```"]
+
+
+@pytest.mark.parametrize("report", ["", None, ["# Report\n"]], ids=["empty", "none", "list"])
+def test_save_rejects_anything_but_a_non_empty_string(report, tmp_path):
+    """Reports are saved only from a non-empty string."""
+    with pytest.raises(ValueError):
+        save_markdown_report(report, str(tmp_path / "report.md"))
+    
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_failed_save_leaves_no_temp_file(tmp_path):
+    """A save that cannot replace its target cleans up its temporary file."""
+    target = tmp_path / "bad.md"
+    target.mkdir()  # os.replace cannot put a file over a directory
+    
+    assert save_markdown_report("# Report\n", str(target)) is False
+    assert list(tmp_path.iterdir()) == [target]
+
+
+def test_save_writes_report(tmp_path):
+    """A successful save leaves only the report, with its exact content."""
+    target = tmp_path / "report.md"
+    
+    assert save_markdown_report("# Report ✓\n", str(target)) is True
+    assert target.read_text(encoding="utf-8") == "# Report ✓\n"
+    assert list(tmp_path.iterdir()) == [target]